@@ -0,0 +1,79 @@
+"""
+Kernel do Prim compilado com Numba, sobre a adjacência CSR de main.build_csr.
+
+Fica num módulo próprio, importado só quando necessário por main._load_prim_kernel:
+funções definidas no nível do módulo têm uma chave estável no cache em disco do Numba,
+o que não acontece com funções aninhadas que chamam umas às outras.
+"""
+import numba
+import numpy as np
+
+
+# Heap binária mínima sobre dois arrays paralelos (chaves e vértices), sem tuplas
+@numba.njit(cache=True)
+def _heap_push(keys, ids, size, key, vid):
+  i = size
+  while i > 0:
+    p = (i - 1) >> 1
+    if keys[p] <= key:
+      break
+    keys[i] = keys[p]
+    ids[i] = ids[p]
+    i = p
+  keys[i] = key
+  ids[i] = vid
+  return size + 1
+
+
+@numba.njit(cache=True)
+def _heap_pop(keys, ids, size):
+  key = keys[0]
+  vid = ids[0]
+  size -= 1
+  last_key = keys[size]
+  last_id = ids[size]
+  i = 0
+  while True:
+    c = 2 * i + 1
+    if c >= size:
+      break
+    if c + 1 < size and keys[c + 1] < keys[c]:
+      c += 1
+    if keys[c] >= last_key:
+      break
+    keys[i] = keys[c]
+    ids[i] = ids[c]
+    i = c
+  keys[i] = last_key
+  ids[i] = last_id
+  return key, vid, size
+
+
+@numba.njit(cache=True)
+def prim_kernel(indptr, indices, weights, n, inf):
+  min_weight = np.full(n, inf, weights.dtype)
+  parent = np.full(n, -1, dtype=np.int32)
+  in_tree = np.zeros(n, dtype=np.bool_)
+  min_weight[0] = 0
+
+  # Cada relaxamento empilha no máximo uma entrada, então len(indices) + 1 basta
+  cap = indices.shape[0] + 1
+  keys = np.empty(cap, dtype=np.float64)
+  ids = np.empty(cap, dtype=np.int32)
+  size = _heap_push(keys, ids, 0, 0.0, 0)
+
+  while size > 0:
+    _, u, size = _heap_pop(keys, ids, size)
+    if in_tree[u]:
+      continue # entrada obsoleta, u já entrou na árvore com peso menor
+    in_tree[u] = True
+
+    for idx in range(indptr[u], indptr[u + 1]):
+      v = indices[idx]
+      wt = weights[idx]
+      if not in_tree[v] and wt < min_weight[v]:
+        min_weight[v] = wt
+        parent[v] = u
+        size = _heap_push(keys, ids, size, wt, v)
+
+  return parent, min_weight
@@ -1,8 +1,11 @@
 import sys
-import math
+import array
+import functools
 import heapq # Heap binária mínima
 import os
-from collections import defaultdict
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     import graphviz
@@ -10,132 +13,579 @@ except ImportError:
     graphviz = None
     print("Graphviz lib isn't installed. Run 'pip install graphviz' to enable visualization.\n")
 
+try:
+    import numpy as np
+except ImportError:
+    np = None # Sem NumPy, o Floyd-Warshall roda na versão em Python puro
+
+# Numba e SciPy são importados só quando necessários: importá-los (e compilar os kernels)
+# custa mais que os próprios algoritmos em grafos pequenos, que ficam em Python/NumPy
+COMPILED_MIN_VERTICES = 200
+
+@functools.lru_cache(maxsize=None)
+def _numba():
+  """Importa o Numba na primeira chamada. None se ele (ou o NumPy) não estiver instalado."""
+  if np is None:
+    return None
+  try:
+    import numba
+  except ImportError:
+    return None # Sem Numba, o Floyd-Warshall com NumPy usa broadcasting
+  return numba
+
+
+@functools.lru_cache(maxsize=None)
+def _scipy_sparse():
+  """Importa o scipy.sparse (com o csgraph) na primeira chamada. None se não estiver instalado."""
+  if np is None:
+    return None
+  try:
+    import scipy.sparse
+    import scipy.sparse.csgraph
+  except ImportError:
+    return None
+  return scipy.sparse
+
+
+# Distância "infinita". Um inteiro grande em vez de math.inf mantém as somas e comparações
+# na aritmética de inteiros (os pesos lidos do arquivo são inteiros). Como INF + w ainda é
+# comparável, toda soma precisa antes conferir que a parcela é menor que INF.
+INF = 10**18
+
 # Leitura de grafo DOT simples
 
-def read_dot_file(path): 
+# Um vértice é um ID entre aspas ou uma sequência sem espaços, colchetes, ';', '{', '}', '='
+# e aspas que não contenha '--' nem '->' (assim "node-1" é um único vértice)
+ID = r'"[^"]*"|(?:(?!--|->)[^\s\[\];{}="])+'
+# Uma declaração de aresta "u -- v [label=w]" ou "u -> v [label=w]", possivelmente em cadeia
+# ("a -- b -- c"); o peso vale para a última aresta da cadeia
+EDGE = re.compile(rf'\s*({ID})((?:\s*(?:--|->)\s*(?:{ID}))+)\s*(?:\[\s*label\s*=\s*("[^"]*"|[^\]\s]+)\s*\])?\s*')
+HOP = re.compile(rf'\s*(--|->)\s*({ID})')
+# Declarações são separadas por ';' ou quebra de linha, fora de aspas
+STATEMENT = re.compile(r'(?:"[^"]*"|[^;\n"])+')
+
+def _unquote(token):
+  return token[1:-1] if token.startswith('"') else token
+
+def read_dot_graph(path):
   """
-  Lê um grafo no formato DOT simples (sem atributos).
-  Retorna (is_directed, edges_list, vertices_list)
+  Lê um grafo no formato DOT simples (sem atributos) já com os vértices indexados.
+  Retorna (is_directed, vertices_list, arrays), onde arrays = (pos, src, dst, w)
+  no mesmo formato de build_edge_arrays.
   """
   with open(path, 'r', encoding='utf-8') as f:
-    content = f.readlines()
-    
-  is_directed = 'digraph' in content[0]
+    text = f.read()
+
+  is_directed = 'digraph' in text[:32]
   delimiter = '->' if is_directed else '--'
-  content = [line.replace('\n', '').replace(';', '').strip().split(delimiter) for line in content[1:-1]]
-  edges = [] 
-  for line in content: 
-    for i in range(len(line) - 1): 
-      line[i+1] = line[i+1].strip().split(' [label=')
-      if len(line[i+1]) == 2:
-        line[i+1][-1] = line[i+1][-1][:-1]
-      else:
-        # Se não houver um peso atribuído no arquivo, será 1
-        line[i+1].append(1)
-      edges.append((line[i].strip(), delimiter, line[i+1][0], line[i+1][1]))
-  
-  vertices = set() 
-  edges_list = [] 
-  for u, type, v, w in edges:
-    edges_list.append((u, v, int(w)))
-    vertices.update([u, v])
-    if type == '--' and not is_directed: # não-direcionado: adicionar aresta inversa
-      # Importante para execução do Floyd-Warshall
-      edges_list.append((v, u, int(w)))
-    if (type == '--' and is_directed) or (type == '->' and not is_directed):
-      raise AssertionError("Graph type and edges connections in file don't match.") 
-    
-  return is_directed, edges_list, sorted(vertices)
+
+  # Cada vértice recebe um id na primeira vez em que aparece
+  vertex_id = {}
+  def idx(name):
+    i = vertex_id.get(name)
+    if i is None:
+      i = vertex_id[name] = len(vertex_id)
+    return i
+
+  start, end = text.find('{'), text.rfind('}')
+  body = text[start + 1:end] if start != -1 and end != -1 else text
+
+  src, dst, w = [], [], []
+  for statement in STATEMENT.findall(body):
+    m = EDGE.fullmatch(statement)
+    if m is None:
+      # Declarações de vértice ou de atributos são ignoradas, mas uma aresta não reconhecida é um erro
+      if '--' in statement or '->' in statement:
+        raise ValueError(f"Unrecognized edge statement: {statement.strip()!r}")
+      continue
+    first, chain, label = m.groups()
+    hops = HOP.findall(chain)
+    u = first
+    for i, (type, v) in enumerate(hops):
+      if type != delimiter:
+        raise AssertionError("Graph type and edges connections in file don't match.") 
+      # Em grafos não direcionados cada aresta é guardada uma única vez;
+      # os algoritmos tratam os dois sentidos a partir de is_directed
+      src.append(idx(_unquote(u)))
+      dst.append(idx(_unquote(v)))
+      # Se não houver um peso atribuído no arquivo, será 1
+      w.append(int(_unquote(label)) if label and i == len(hops) - 1 else 1)
+      u = v
+
+  # Renumera em ordem alfabética, que é a ordem exibida e a que define a origem do Bellman-Ford
+  vertices = sorted(vertex_id)
+  pos = {v: i for i, v in enumerate(vertices)}
+  rank = [0] * len(vertices)
+  for name, i in vertex_id.items():
+    rank[i] = pos[name]
+  src = [rank[u] for u in src]
+  dst = [rank[v] for v in dst]
+  return is_directed, vertices, _edge_arrays(pos, src, dst, w)
+
+
+def read_dot_file(path): 
+  """
+  Lê um grafo no formato DOT simples (sem atributos).
+  Retorna (is_directed, edges_list, vertices_list). Em grafos não direcionados
+  edges_list traz cada aresta nos dois sentidos, para que os algoritmos possam ser
+  chamados sem is_directed (como antes de read_dot_graph).
+  """
+  is_directed, vertices, arrays = read_dot_graph(path)
+  edges_list = edges_from_arrays(vertices, arrays)
+  if not is_directed: # não-direcionado: adicionar aresta inversa
+    edges_list += [(v, u, w) for u, v, w in edges_list]
+  return is_directed, edges_list, vertices
+
+
+# Arestas em arrays paralelos (structure of arrays)
+
+def build_edge_arrays(vertices, edges):
+  """
+  Converte a lista de arestas (u, v, w) em três arrays paralelos (listas, caso o NumPy
+  não esteja instalado). Retorna (pos, src, dst, w), onde pos mapeia cada vértice para seu índice.
+  """
+  pos = {v: i for i, v in enumerate(vertices)}
+  src = [pos[u] for u, _, _ in edges]
+  dst = [pos[v] for _, v, _ in edges]
+  w = [w for _, _, w in edges]
+  return _edge_arrays(pos, src, dst, w)
+
+
+def _edge_arrays(pos, src, dst, w):
+  if np is None:
+    return pos, src, dst, w
+  # int64 para pesos inteiros, float64 caso contrário
+  return pos, np.asarray(src, dtype=np.int32), np.asarray(dst, dtype=np.int32), np.asarray(w)
+
+
+def edges_from_arrays(vertices, arrays):
+  """Operação inversa de build_edge_arrays: devolve a lista de arestas (u, v, w) por nome."""
+  src, dst, w = _as_lists(arrays[1:])
+  return [(vertices[u], vertices[v], wt) for u, v, wt in zip(src, dst, w)]
+
+
+def build_csr(n, src, dst, w, is_directed=True):
+  """
+  Monta a lista de adjacência no formato CSR (compressed sparse row): os vizinhos
+  de u são indices[indptr[u]:indptr[u+1]], com pesos em weights na mesma faixa.
+  Em grafos não direcionados cada aresta aparece nos dois sentidos.
+  """
+  if np is None:
+    if not is_directed:
+      src, dst, w = src + dst, dst + src, w + w
+    indptr = [0] * (n + 1)
+    for u in src:
+      indptr[u + 1] += 1
+    for u in range(n):
+      indptr[u + 1] += indptr[u]
+    fill = indptr[:-1] # próxima posição livre na faixa de cada vértice
+    indices = [0] * len(src)
+    weights = [0] * len(src)
+    for u, v, wt in zip(src, dst, w):
+      indices[fill[u]] = v
+      weights[fill[u]] = wt
+      fill[u] += 1
+    return indptr, indices, weights
+
+  if not is_directed:
+    src, dst, w = np.concatenate((src, dst)), np.concatenate((dst, src)), np.concatenate((w, w))
+  indptr = np.zeros(n + 1, dtype=np.int32)
+  np.add.at(indptr[1:], src, 1)
+  np.cumsum(indptr, out=indptr)
+  order = np.argsort(src, kind='stable')
+  return indptr, dst[order], w[order]
+
+
+def _scipy_graph(n, src, dst, w):
+  """
+  Matriz esparsa n x n para o scipy.sparse.csgraph. Arestas repetidas ficam só com
+  o menor peso, já que a csr_matrix somaria os valores duplicados.
+  """
+  order = np.lexsort((w, dst, src))
+  src, dst, w = src[order], dst[order], w[order]
+  first = np.ones(len(src), dtype=bool)
+  first[1:] = (src[1:] != src[:-1]) | (dst[1:] != dst[:-1])
+  return _scipy_sparse().csr_matrix((w[first].astype(np.float64), (src[first], dst[first])), shape=(n, n))
+
+
+def _dist_dtype(w):
+  """Tipo das distâncias: int64 para pesos inteiros, float64 caso contrário."""
+  return np.result_type(w.dtype, np.int64)
+
+
+def _from_scipy_dist(dist, w):
+  """O SciPy devolve float64 com np.inf; converte para o sentinela INF e o tipo dos pesos."""
+  dist[np.isinf(dist)] = INF
+  return dist.astype(_dist_dtype(w))
+
+
+def _as_lists(arrays):
+  """Listas Python são mais rápidas que escalares NumPy para acesso elemento a elemento."""
+  return [a.tolist() if hasattr(a, "tolist") else a for a in arrays]
 
 
 # Algoritmo de Prim (Árvore Geradora Mínima)
 
-def prim(vertices, edges):
+def prim(vertices, edges, csr=None):
+  """
+  csr é a adjacência (indptr, indices, weights) de build_csr com cada aresta nos
+  dois sentidos; se omitida, é montada a partir de edges.
+  """
   if not vertices:
     return []
 
-  adj = defaultdict(list)
-  for u, v, w in edges:
-    adj[u].append((v, w))
-    adj[v].append((u, w))
+  n = len(vertices)
+  if csr is None:
+    _, src, dst, w = build_edge_arrays(vertices, edges)
+    csr = build_csr(n, src, dst, w, is_directed=False)
+
+  kernel = _load_prim_kernel() if n >= COMPILED_MIN_VERTICES else None
+  if kernel is not None:
+    return _prim_numba(kernel, vertices, *csr)
 
-  root = vertices[0]
-  min_weight = {v: math.inf for v in vertices}
-  parent = {v: None for v in vertices}
-  min_weight[root] = 0
+  indptr, indices, weights = _as_lists(csr)
 
-  pq = [(0, root)]
-  in_tree = set()
+  min_weight = [INF] * n
+  parent = [-1] * n
+  min_weight[0] = 0
+
+  # O heap guarda (peso, índice): em empates compara inteiros em vez de strings
+  pq = [(0, 0)]
+  in_tree = bytearray(n)
 
   while pq:
     k, u = heapq.heappop(pq)
-    if u in in_tree:
+    if in_tree[u]:
       continue
-    in_tree.add(u)
+    in_tree[u] = 1
 
-    for v, w in adj[u]:
-      if v not in in_tree and w < min_weight[v]:
-        min_weight[v] = w
+    for idx in range(indptr[u], indptr[u + 1]):
+      v = indices[idx]
+      wt = weights[idx]
+      if not in_tree[v] and wt < min_weight[v]:
+        min_weight[v] = wt
         parent[v] = u
-        heapq.heappush(pq, (w, v)) 
+        heapq.heappush(pq, (wt, v))
 
-  mst_edges = [(parent[v], v, min_weight[v]) for v in vertices if parent[v] is not None]
-  total_weight = sum(min_weight[v] for v in vertices if parent[v] is not None)
+  mst_edges = [(vertices[parent[i]], v, min_weight[i]) for i, v in enumerate(vertices) if parent[i] != -1]
+  total_weight = sum(min_weight[i] for i in range(n) if parent[i] != -1)
   return mst_edges, total_weight
 
 
+@functools.lru_cache(maxsize=None)
+def _load_prim_kernel():
+  """Compila o kernel do Prim na primeira vez em que é usado. None se o Numba não estiver instalado."""
+  if _numba() is None:
+    return None
+  # O módulo importa o Numba; as funções no nível do módulo permitem reusar o cache em disco
+  import _prim_kernel
+  return _prim_kernel.prim_kernel
+
+
+def _prim_numba(kernel, vertices, indptr, indices, weights):
+  parent, min_weight = kernel(indptr, indices, weights, len(vertices), INF)
+  in_mst = parent != -1
+  mst_weights = min_weight[in_mst].tolist() # min_weight já tem o tipo dos pesos
+  mst_edges = [(vertices[parent[i]], vertices[i], wt) for i, wt in zip(np.flatnonzero(in_mst).tolist(), mst_weights)]
+  return mst_edges, sum(mst_weights)
+
+
 # Algoritmo de Bellman-Ford
 
-def bellman_ford(vertices, edges, source):
-  dist = {v: math.inf for v in vertices}
-  parent = {v: None for v in vertices}
-  dist[source] = 0
+def bellman_ford(vertices, edges, source, arrays=None, is_directed=True):
+  """
+  arrays é o retorno de build_edge_arrays; se omitido, é montado a partir de edges.
+  Se is_directed for False, cada aresta é relaxada nos dois sentidos.
+  """
+  if arrays is None:
+    arrays = build_edge_arrays(vertices, edges)
+  if np is not None:
+    return _bellman_ford_numpy(vertices, source, *arrays, is_directed)
 
-  for _ in range(len(vertices) - 1):
+  n = len(vertices)
+  pos, src, dst, w = arrays
+  # Listas indexadas por posição são mais rápidas que dicionários no laço interno
+  indexed_edges = list(zip(src, dst, w))
+  dist = [INF] * n
+  parent = [-1] * n
+  dist[pos[source]] = 0
+
+  for _ in range(n - 1):
     updated = False
-    for u, v, w in edges:
-      if dist[u] + w < dist[v]:
-        dist[v] = dist[u] + w
-        parent[v] = u
-        updated = True
+    for u, v, w in indexed_edges:
+      du = dist[u]
+      if du < INF: # se u ainda não foi alcançado, a aresta não pode relaxar
+        nv = du + w
+        if nv < dist[v]:
+          dist[v] = nv
+          parent[v] = u
+          updated = True
+      if not is_directed:
+        dv = dist[v]
+        if dv < INF and dv + w < dist[u]:
+          dist[u] = dv + w
+          parent[u] = v
+          updated = True
     if not updated:
       break # Houve uma iteração sem relaxamento, logo se houverem mais elas também não terão 
 
   # Verificar ciclos negativos
-  for u, v, w in edges:
-    if dist[u] + w < dist[v]:
+  for u, v, w in indexed_edges:
+    du, dv = dist[u], dist[v]
+    if (du < INF and du + w < dv) or (not is_directed and dv < INF and dv + w < du):
       raise ValueError("Grafo contém ciclo negativo.")
 
-  return dist, parent
+  return ({v: dist[i] for i, v in enumerate(vertices)},
+          {v: vertices[parent[i]] if parent[i] != -1 else None for i, v in enumerate(vertices)})
 
 
-# Algoritmo de Floyd-Warshall
+def _bellman_ford_numpy(vertices, source, pos, src, dst, w, is_directed):
+  n = len(vertices)
+  if not is_directed:
+    src, dst, w = np.concatenate((src, dst)), np.concatenate((dst, src)), np.concatenate((w, w))
+  dist = np.full(n, INF, dtype=_dist_dtype(w))
+  parent = np.full(n, -1, dtype=np.int32)
+  dist[pos[source]] = 0
+
+  # Cada iteração relaxa todas as arestas de uma vez a partir das distâncias da iteração anterior
+  for _ in range(n - 1):
+    du = dist[src]
+    new = du + w
+    mask = (du < INF) & (new < dist[dst])
+    if not mask.any():
+      break
+    np.minimum.at(dist, dst[mask], new[mask])
+    # O pai de v é a origem de uma aresta que atingiu o novo mínimo de v
+    best = mask & (new == dist[dst])
+    parent[dst[best]] = src[best]
+
+  # Verificar ciclos negativos
+  du = dist[src]
+  if ((du < INF) & (du + w < dist[dst])).any():
+    raise ValueError("Grafo contém ciclo negativo.")
+
+  return ({v: dist[i].item() for i, v in enumerate(vertices)},
+          {v: vertices[parent[i]] if parent[i] != -1 else None for i, v in enumerate(vertices)})
 
-def floyd_warshall(vertices, edges):
+
+# Shortest Path Faster Algorithm (Bellman-Ford com fila)
+
+def spfa(vertices, edges, source, csr=None, is_directed=True):
+  """
+  Variante do Bellman-Ford que só relaxa as arestas de vértices cuja distância
+  acabou de diminuir. Retorna (dist, parent) como o bellman_ford.
+  csr é a adjacência de build_csr; se omitida, é montada a partir de edges.
+  """
   n = len(vertices)
-  pos = {v: i for i, v in enumerate(vertices)}
-  dist = [[math.inf]*n for _ in range(n)]
-  next_node = [[None]*n for _ in range(n)]
+  if csr is None:
+    _, src, dst, w = build_edge_arrays(vertices, edges)
+    csr = build_csr(n, src, dst, w, is_directed)
+  indptr, indices, weights = _as_lists(csr)
+
+  s = vertices.index(source)
+  dist = [INF] * n
+  parent = [-1] * n
+  dist[s] = 0
+
+  q = deque([s])
+  in_q = bytearray(n)
+  in_q[s] = 1
+  count = [0] * n
+
+  while q:
+    u = q.popleft()
+    in_q[u] = 0
+    for idx in range(indptr[u], indptr[u + 1]):
+      v = indices[idx]
+      nv = dist[u] + weights[idx]
+      if nv < dist[v]:
+        dist[v] = nv
+        parent[v] = u
+        if not in_q[v]:
+          q.append(v)
+          in_q[v] = 1
+          count[v] += 1
+          # Sem ciclo negativo, um vértice entra na fila no máximo |V|-1 vezes
+          if count[v] >= n:
+            raise ValueError("Grafo contém ciclo negativo.")
 
-  for v in vertices:
-    dist[pos[v]][pos[v]] = 0
-    next_node[pos[v]][pos[v]] = v
-  for u, v, w in edges:
-    dist[pos[u]][pos[v]] = min(dist[pos[u]][pos[v]], w)
-    next_node[pos[u]][pos[v]] = v
+  return ({v: dist[i] for i, v in enumerate(vertices)},
+          {v: vertices[parent[i]] if parent[i] != -1 else None for i, v in enumerate(vertices)})
+
+
+# Algoritmo de Floyd-Warshall
+
+def floyd_warshall(vertices, edges, arrays=None, is_directed=True):
+  """
+  Retorna (dist, pos, next_node), onde next_node[i][j] é o índice do próximo
+  vértice no caminho mínimo de i até j (-1 se não houver caminho).
+  arrays é o retorno de build_edge_arrays; se omitido, é montado a partir de edges.
+  """
+  if arrays is None:
+    arrays = build_edge_arrays(vertices, edges)
+  if np is not None:
+    # O kernel Numba é o caminho mais rápido; o SciPy só entra quando o Numba não está instalado
+    kernel = None
+    if len(vertices) >= COMPILED_MIN_VERTICES:
+      kernel = _load_fw_kernel()
+      if kernel is None and _scipy_sparse() is not None:
+        return _floyd_warshall_scipy(vertices, *arrays, is_directed)
+    return _floyd_warshall_numpy(vertices, *arrays, is_directed, kernel)
+
+  n = len(vertices)
+  pos, src, dst, w = arrays
+  # Matrizes achatadas em ordem de linha: a célula (i, j) fica em i*n + j.
+  # Com pesos inteiros as distâncias ficam num array de int64 ('q')
+  typecode = 'q' if all(isinstance(wt, int) for wt in w) else 'd'
+  dist = array.array(typecode, [INF] * (n * n))
+  next_node = array.array('i', [-1] * (n * n))
+
+  for i in range(n):
+    dist[i*n + i] = 0
+    next_node[i*n + i] = i
+  for u, v, wt in zip(src, dst, w):
+    uv = u*n + v
+    dist[uv] = min(dist[uv], wt)
+    next_node[uv] = v
+    if not is_directed: # espelha a aresta na mesma passada
+      vu = v*n + u
+      dist[vu] = min(dist[vu], wt)
+      next_node[vu] = u
 
   for k in range(n):
+    kn = k*n
+    # Só os j alcançáveis a partir de k (sem ciclo negativo, a linha k não muda nesta iteração)
+    row_k = [(j, dist[kn + j]) for j in range(n) if dist[kn + j] < INF]
     for i in range(n):
-      for j in range(n):
-        if dist[i][j] > dist[i][k] + dist[k][j]:
-          dist[i][j] = dist[i][k] + dist[k][j]
-          next_node[i][j] = next_node[i][k]
+      i_n = i*n
+      dik = dist[i_n + k]
+      if dik == INF:
+        continue # nenhum caminho de i passando por k pode melhorar
+      nik = next_node[i_n + k]
+      for j, dkj in row_k:
+        i_j = i_n + j
+        via_k = dik + dkj
+        if dist[i_j] > via_k:
+          dist[i_j] = via_k
+          next_node[i_j] = nik
+
+  # Um vértice com distância negativa até si mesmo está num ciclo negativo
+  if any(dist[i*n + i] < 0 for i in range(n)):
+    raise ValueError("Grafo contém ciclo negativo.")
+
+  # Devolve uma linha por vértice para manter o acesso dist[i][j] dos chamadores
+  return ([dist[i*n:(i+1)*n] for i in range(n)], pos,
+          [next_node[i*n:(i+1)*n] for i in range(n)])
+
+
+@functools.lru_cache(maxsize=None)
+def _load_fw_kernel():
+  """Compila o kernel do Floyd-Warshall na primeira vez em que é usado. None se o Numba não estiver instalado."""
+  numba = _numba()
+  if numba is None:
+    return None
+
+  # fastmath é seguro porque o infinito é o sentinela INF (finito), nunca np.inf
+  @numba.njit(cache=True, fastmath=True, boundscheck=False)
+  def _fw_kernel(dist, next_node):
+    n = dist.shape[0]
+    for k in range(n):
+      for i in range(n):
+        dik = dist[i, k]
+        if dik == INF:
+          continue # nenhum caminho de i passando por k pode melhorar
+        nik = next_node[i, k]
+        for j in range(n):
+          dkj = dist[k, j]
+          if dkj == INF:
+            continue
+          v = dik + dkj
+          if v < dist[i, j]:
+            dist[i, j] = v
+            next_node[i, j] = nik
+
+  return _fw_kernel
+
+
+def _floyd_warshall_numpy(vertices, pos, src, dst, w, is_directed, kernel=None):
+  n = len(vertices)
+  dist = np.full((n, n), INF, dtype=_dist_dtype(w))
+  next_node = np.full((n, n), -1, dtype=np.int32)
 
+  np.fill_diagonal(dist, 0)
+  next_node[np.arange(n), np.arange(n)] = np.arange(n)
+  np.minimum.at(dist, (src, dst), w) # minimum.at trata arestas repetidas
+  next_node[src, dst] = dst
+  if not is_directed:
+    np.minimum.at(dist, (dst, src), w)
+    next_node[dst, src] = src
+
+  if kernel is not None:
+    kernel(dist, next_node) # atualiza dist e next_node in-place
+  else:
+    # Apenas o laço em k fica em Python; as linhas i e colunas j são atualizadas por broadcasting
+    for k in range(n):
+      col_k, row_k = dist[:, k:k+1], dist[k:k+1, :]
+      new = col_k + row_k
+      mask = (new < dist) & (col_k < INF) & (row_k < INF)
+      dist = np.where(mask, new, dist)
+      next_node = np.where(mask, next_node[:, k:k+1], next_node)
+
+  # Um vértice com distância negativa até si mesmo está num ciclo negativo
+  if (np.diagonal(dist) < 0).any():
+    raise ValueError("Grafo contém ciclo negativo.")
   return dist, pos, next_node
 
 
+def _floyd_warshall_scipy(vertices, pos, src, dst, w, is_directed):
+  graph = _scipy_graph(len(vertices), src, dst, w)
+  csgraph = _scipy_sparse().csgraph
+  try:
+    dist, pred = csgraph.floyd_warshall(graph, directed=is_directed, return_predecessors=True)
+  except csgraph.NegativeCycleError:
+    raise ValueError("Grafo contém ciclo negativo.")
+  return _from_scipy_dist(dist, w), pos, _next_from_predecessors(pred)
+
+
+def _next_from_predecessors(pred):
+  """
+  Converte a matriz de predecessores do SciPy (pred[i][j] é o vértice antes de j no
+  caminho de i até j) na matriz next_node usada aqui (o vértice depois de i).
+  """
+  n = pred.shape[0]
+  next_node = np.full((n, n), -1, dtype=np.int32)
+  for i, pred_row in enumerate(pred.tolist()):
+    row = [-1] * n
+    row[i] = i
+    for j in range(n):
+      if row[j] != -1 or pred_row[j] < 0:
+        continue # já calculado, ou j não é alcançável a partir de i
+      # Sobe pelos predecessores até um vértice cujo próximo passo já é conhecido
+      stack = []
+      cur = j
+      while row[cur] == -1:
+        stack.append(cur)
+        cur = pred_row[cur]
+      for c in reversed(stack):
+        p = pred_row[c]
+        row[c] = c if p == i else row[p]
+    next_node[i] = row
+  return next_node
+
+
 # Visualização com Graphviz
 
+def _render_one(job):
+  """
+  Renderiza um PNG a partir do código DOT. O 'dot' devolve a imagem em memória (pipe),
+  sem gravar e apagar o arquivo .gv intermediário.
+  """
+  name, source = job
+  png = graphviz.Source(source).pipe(format='png')
+  with open(f"{name}.png", 'wb') as f:
+    f.write(png)
+
+
 def generate_graph(is_directed, edges, output_path="graph.png"):
   if graphviz is None:
     print("Graphviz not available. Install with 'pip install graphviz' and verify if Graphviz is in PATH.")
@@ -151,7 +601,7 @@ def generate_graph(is_directed, edges, output_path="graph.png"):
     dot.edge(u, v, label=str(w))
     added.add((u, v))
 
-  dot.render(filename=output_path, format='png', cleanup=True)
+  _render_one((output_path, dot.source))
   print(f"Grafo gerado: {output_path}.png")
 
 
@@ -163,7 +613,7 @@ def visualize_mst(mst_edges, name="mst_tree"):
   dot = graphviz.Graph(comment="Árvore Geradora Mínima")
   for u, v, w in mst_edges:
     dot.edge(u, v, label=str(w))
-  dot.render(filename=name, format='png', cleanup=True)
+  _render_one((name, dot.source))
   print(f"Árvore Geradora Mínima gerada: {name}.png")
 
 
@@ -179,30 +629,37 @@ def visualize_bellman_paths(edges, parent, source, is_directed, name="bellman_pa
         if p is not None:
             used.add((p, v) if is_directed else tuple(sorted((p, v))))
 
+    # Separa as arestas em usadas e não usadas, para desenhar cada grupo com atributos fixos
+    red_edges = []
+    gray_edges = []
     added = set()
     for u, v, w in edges:
         key = (u, v) if is_directed else tuple(sorted((u, v)))
         if not is_directed and key in added:
             continue
         added.add(key)
+        (red_edges if key in used else gray_edges).append((u, v, str(w)))
 
-        color = "red" if key in used else "gray"
-        penwidth = "2" if key in used else "1"
-        dot.edge(u, v, label=str(w), color=color, penwidth=penwidth)
+    for u, v, label in red_edges:
+        dot.edge(u, v, label=label, color="red", penwidth="2")
+    for u, v, label in gray_edges:
+        dot.edge(u, v, label=label, color="gray", penwidth="1")
 
     dot.node(source, color="red", style="filled", fillcolor="#ffcccc")
-    dot.render(filename=name, format="png", cleanup=True)
+    _render_one((name, dot.source))
     print(f"Caminhos Bellman-Ford gerados: {name}.png")
 
 
 def reconstruct_path(u, v, pos, next_node):
   """Reconstrói o caminho mínimo entre u e v a partir da matriz next_node."""
-  if next_node[pos[u]][pos[v]] is None:
+  i, j = pos[u], pos[v]
+  if next_node[i][j] == -1:
     return []
+  vertices = list(pos) # pos foi montado na ordem dos índices
   path = [u]
-  while u != v:
-    u = next_node[pos[u]][pos[v]]
-    path.append(u)
+  while i != j:
+    i = int(next_node[i][j])
+    path.append(vertices[i])
   return path
 
 
@@ -210,36 +667,56 @@ def visualize_floyd_paths_per_source(vertices, edges, dist, pos, next_node, is_d
     if graphviz is None:
         return
 
+    # As arestas desenhadas (sem duplicatas) e seus rótulos são os mesmos para todas as origens
+    drawn_edges = []
+    added = set()
+    for u, v, w in edges:
+        key = (u, v) if is_directed else tuple(sorted((u, v)))
+        if not is_directed and key in added:
+            continue
+        added.add(key)
+        drawn_edges.append((u, v, key, str(w)))
+
+    jobs = []
+    # Índices inteiros em listas Python (vale tanto para a matriz NumPy quanto para a lista de listas)
+    next_rows = next_node.tolist() if hasattr(next_node, "tolist") else next_node
+    n = len(vertices)
     for i, source in enumerate(vertices):
-        used_edges = set()
+        used = set()
 
-        # Constrói conjunto de arestas que fazem parte de algum caminho mínimo
-        for j, target in enumerate(vertices):
-            if source == target or dist[i][j] == math.inf:
+        # Constrói conjunto de arestas que fazem parte de algum caminho mínimo,
+        # percorrendo next_node direto pelos índices, sem montar cada caminho
+        for j in range(n):
+            if i == j or dist[i][j] == INF:
                 continue
-            path = reconstruct_path(source, target, pos, next_node)
-            for k in range(len(path) - 1):
-                if is_directed:
-                    used_edges.add((path[k], path[k + 1]))
-                else:
-                    used_edges.add(tuple(sorted((path[k], path[k + 1]))))
+            cur = i
+            while cur != j:
+                nxt = next_rows[cur][j]
+                used.add((cur, nxt))
+                cur = nxt
+
+        used_edges = set()
+        for a, b in used:
+            if is_directed:
+                used_edges.add((vertices[a], vertices[b]))
+            else:
+                used_edges.add(tuple(sorted((vertices[a], vertices[b]))))
 
         dot = graphviz.Digraph(comment=f"Caminhos mínimos a partir de {source}") if is_directed else graphviz.Graph(comment=f"Caminhos mínimos a partir de {source}")
         dot.node(source, color="red", style="filled", fillcolor="#ffcccc")
 
-        added = set()
-        for u, v, w in edges:
-            key = (u, v) if is_directed else tuple(sorted((u, v)))
-            if not is_directed and key in added:
-                continue
-            added.add(key)
-
+        for u, v, key, label in drawn_edges:
             color = "green" if key in used_edges else "gray"
             penwidth = "2" if key in used_edges else "1"
-            dot.edge(u, v, label=str(w), color=color, penwidth=penwidth)
+            dot.edge(u, v, label=label, color=color, penwidth=penwidth)
+
+        jobs.append((f"{name_prefix}_{source}", dot.source))
 
-        file_name = f"{name_prefix}_{source}"
-        dot.render(filename=file_name, format="png", cleanup=True)
+    # Cada imagem é independente, então as chamadas ao 'dot' rodam em paralelo. Threads bastam:
+    # cada tarefa só espera o subprocesso do 'dot', e a GIL é liberada durante a espera
+    with ThreadPoolExecutor() as ex:
+        list(ex.map(_render_one, jobs))
+    for (file_name, _), source in zip(jobs, vertices):
         print(f"Caminhos Floyd-Warshall a partir de '{source}' gerados: {file_name}.png")
 
 
@@ -248,13 +725,19 @@ def visualize_floyd_paths_per_source(vertices, edges, dist, pos, next_node, is_d
 
 def main():
   if len(sys.argv) < 2:
-    print("Uso: python trabalho2.py <arquivo.dot> [--plot]")
+    print("Uso: python trabalho2.py <arquivo.dot> [--plot] [--floyd-viz]")
     sys.exit(1)
 
   path = sys.argv[1]
-  plot = len(sys.argv) == 3 and sys.argv[2] == "--plot"
+  # As imagens do Floyd-Warshall (uma por vértice) são a saída mais cara, então ficam atrás de uma flag própria
+  floyd_viz = "--floyd-viz" in sys.argv[2:]
+  plot = "--plot" in sys.argv[2:] or floyd_viz
 
-  is_directed, edges, vertices = read_dot_file(path)
+  # Índices dos vértices e adjacência montados uma única vez e compartilhados pelos algoritmos
+  is_directed, vertices, arrays = read_dot_graph(path)
+  _, src, dst, w = arrays
+  edges = edges_from_arrays(vertices, arrays) # por nome, para exibição e visualização
+  csr = build_csr(len(vertices), src, dst, w, is_directed)
 
   print(f"Grafo {'direcionado' if is_directed else 'não direcionado'}")
   print("Vértices:", vertices)
@@ -262,7 +745,7 @@ def main():
 
   # Prim (apenas grafos não direcionados)
   if not is_directed:
-    mst_edges, total_weight = prim(vertices, edges)
+    mst_edges, total_weight = prim(vertices, edges, csr)
     print("\n=== Algoritmo de Prim ===")
     print("Arestas da AGM:", mst_edges)
     print(f"Peso total da árvore: {total_weight}")
@@ -273,9 +756,9 @@ def main():
   parent = None
   neg_cycle = False
   try:
-    dist, parent = bellman_ford(vertices, edges, source)
+    dist, parent = spfa(vertices, edges, source, csr, is_directed)
     for v in vertices:
-      print(f"{source} -> {v}: dist = {dist[v]}, pai = {parent[v]}")
+      print(f"{source} -> {v}: dist = {dist[v] if dist[v] < INF else '∞'}, pai = {parent[v]}")
   except ValueError as e:
     print("Erro:", e)
     neg_cycle = True
@@ -286,11 +769,16 @@ def main():
   # caso não exista ciclo negativo.
   if not neg_cycle:
     print("\n=== Algoritmo de Floyd-Warshall ===")
-    dist, pos, next_node = floyd_warshall(vertices, edges)
+    try:
+      dist, pos, next_node = floyd_warshall(vertices, edges, arrays, is_directed)
+    except ValueError as e:
+      # Um ciclo negativo que não é alcançável a partir da origem do Bellman-Ford só é detectado aqui
+      print("Erro:", e)
+      return
     print("Matriz de distâncias:")
     print("    ", " ".join(vertices))
     for i, u in enumerate(vertices):
-      row = " ".join(f"{dist[i][pos[v]] if dist[i][pos[v]] != math.inf else '∞':>5}" for v in vertices)
+      row = " ".join(f"{dist[i][pos[v]] if dist[i][pos[v]] < INF else '∞':>5}" for v in vertices)
       print(f"{u:>3} {row}")
 
 
@@ -306,7 +794,8 @@ def main():
       if not is_directed:
         visualize_mst(mst_edges)
         visualize_bellman_paths(edges, parent, source, is_directed)
-        visualize_floyd_paths_per_source(vertices, edges, dist, pos, next_node, is_directed)
+        if floyd_viz:
+          visualize_floyd_paths_per_source(vertices, edges, dist, pos, next_node, is_directed)
 
 if __name__ == "__main__":
   main()